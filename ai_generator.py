@@ -3,17 +3,57 @@ AI Image Generator - Generate clip-art style images using Google's Gemini API.
 """
 
 import os
-import configparser
-from pathlib import Path
+import threading
+from collections import OrderedDict
+from typing import Tuple
 from io import BytesIO
-import base64
 from urllib import response
 
 from PIL import Image
 
+from config import CONFIG_PATH, load_config
+
+# pybase64 is a drop-in, SIMD-accelerated replacement for the stdlib module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# google-genai is optional; generate_image reports a clear error without it
+try:
+    from google import genai
+    from google.genai import types
+except ImportError:
+    genai = None
+    types = None
+
 # Gemini API configuration
 GEMINI_API_KEY_ENV = 'GEMINI_API_KEY'
-CONFIG_PATH = Path.home() / '.print-hole.conf'
+
+# Upper bound on a single Gemini request, so a stalled call releases its
+# worker thread well before gunicorn's 120s worker timeout
+GEMINI_TIMEOUT_MS = 60_000
+
+# Wrapper for user prompts to get clip-art style black and white output
+PROMPT_TEMPLATE = (
+    "Create a simple black and white clip-art style illustration: {}. "
+    "Use bold black lines on white background, high contrast, no gradients, "
+    "simple shapes, suitable for thermal printing."
+)
+
+# User prompts are truncated to this many characters before sending
+MAX_PROMPT_LENGTH = 512
+
+# Number of distinct prompts whose generated images are kept in memory.
+# Each is a raw Gemini PNG of 1-2 MB, held per worker process
+GENERATION_CACHE_SIZE = 4
+_generation_cache = OrderedDict()
+_generation_cache_lock = threading.Lock()
+
+# Shared Gemini client (created lazily by _get_client)
+_CLIENT = None
+_CLIENT_KEY = None
+_CLIENT_LOCK = threading.Lock()
 
 
 def get_api_key() -> str:
@@ -24,6 +64,9 @@ def get_api_key() -> str:
     1. GEMINI_API_KEY environment variable
     2. [gemini] api_key in ~/.print-hole.conf
     
+    The config file is only re-parsed when it changes, so edits to the key
+    take effect on the next request.
+    
     Returns:
         API key string
         
@@ -36,13 +79,9 @@ def get_api_key() -> str:
         return api_key
     
     # Check config file
-    if CONFIG_PATH.exists():
-        config = configparser.ConfigParser()
-        config.read(CONFIG_PATH)
-        if config.has_option('gemini', 'api_key'):
-            api_key = config.get('gemini', 'api_key').strip()
-            if api_key:
-                return api_key
+    api_key = load_config().get('gemini', {}).get('api_key', '').strip()
+    if api_key:
+        return api_key
     
     raise ValueError(
         f"Gemini API key not found. Set {GEMINI_API_KEY_ENV} environment variable "
@@ -50,15 +89,81 @@ def get_api_key() -> str:
     )
 
 
-def generate_image(prompt: str) -> Image.Image:
+def _get_client(api_key: str) -> "genai.Client":
+    """
+    Return the shared Gemini client, creating it on first use.
+    
+    Reusing one client keeps its HTTP connection pool (and TLS session) warm
+    across requests. A new client is built only if the API key changes.
+    """
+    global _CLIENT, _CLIENT_KEY
+    with _CLIENT_LOCK:
+        if _CLIENT is None or _CLIENT_KEY != api_key:
+            _CLIENT = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(timeout=GEMINI_TIMEOUT_MS)
+            )
+            _CLIENT_KEY = api_key
+        return _CLIENT
+
+
+def _generate_png_bytes(api_key: str, enhanced_prompt: str, regenerate: bool = False) -> bytes:
+    """
+    Return the raw image bytes for an enhanced prompt.
+    
+    Results are cached in-process so repeated prompts skip the API round-trip.
+    With regenerate, Gemini is always called and the new image replaces the
+    cached one. Failures raise and are therefore never cached.
+    """
+    key = (api_key, enhanced_prompt)
+    if not regenerate:
+        with _generation_cache_lock:
+            image_data = _generation_cache.get(key)
+            if image_data is not None:
+                _generation_cache.move_to_end(key)
+                return image_data
+    
+    image_data = _call_gemini(api_key, enhanced_prompt)
+    with _generation_cache_lock:
+        _generation_cache[key] = image_data
+        _generation_cache.move_to_end(key)
+        if len(_generation_cache) > GENERATION_CACHE_SIZE:
+            _generation_cache.popitem(last=False)
+    return image_data
+
+
+def _call_gemini(api_key: str, enhanced_prompt: str) -> bytes:
+    """Call Gemini and return the raw image bytes for an enhanced prompt."""
+    client = _get_client(api_key)
+    
+    response = client.models.generate_content(
+        model="gemini-2.5-flash-image",
+        contents=[enhanced_prompt],
+        # config=types.GenerateImagesConfig(
+        #     number_of_images=1,
+        #     aspect_ratio="1:1",
+        # )
+    )
+
+    for part in response.parts:
+        if part.text is not None:
+            print(part.text)
+        elif part.inline_data is not None:
+            return part.inline_data.data
+    
+    raise RuntimeError("No image was generated")
+
+
+def generate_image(prompt: str, regenerate: bool = False) -> Tuple[Image.Image, bytes]:
     """
     Generate a black-and-white clip-art style image from a text prompt.
     
     Args:
         prompt: Text description of the image to generate
+        regenerate: Ask Gemini for a new image even if this prompt is cached
         
     Returns:
-        PIL Image in grayscale mode
+        Tuple of (PIL Image in grayscale mode, original encoded image bytes)
         
     Raises:
         ValueError: If API key is missing or prompt is empty
@@ -69,52 +174,24 @@ def generate_image(prompt: str) -> Image.Image:
     
     api_key = get_api_key()
     
-    # Import google.genai here to avoid import errors if not installed
-    try:
-        from google import genai
-        from google.genai import types
-    except ImportError:
+    if genai is None:
         raise RuntimeError(
             "google-genai package not installed. "
             "Run: pip install google-genai"
         )
     
-    # Create client with API key
-    client = genai.Client(api_key=api_key)
-    
     # Enhance prompt for clip-art style black and white output
-    enhanced_prompt = (
-        f"Create a simple black and white clip-art style illustration: {prompt}. "
-        "Use bold black lines on white background, high contrast, no gradients, "
-        "simple shapes, suitable for thermal printing."
-    )
+    enhanced_prompt = PROMPT_TEMPLATE.format(prompt.strip()[:MAX_PROMPT_LENGTH])
     
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-image",
-            contents=[enhanced_prompt],
-            # config=types.GenerateImagesConfig(
-            #     number_of_images=1,
-            #     aspect_ratio="1:1",
-            # )
-        )
-        generated_image = None
-
-        for part in response.parts:
-            if part.text is not None:
-                print(part.text)
-            elif part.inline_data is not None:
-                image_data = part.inline_data.data
-                generated_image = Image.open(BytesIO(image_data))
-                break
-        
-        if not generated_image:
-            raise RuntimeError("No image was generated")
+        # Cache holds the raw bytes; decoding and grayscale run per request
+        image_data = _generate_png_bytes(api_key, enhanced_prompt, regenerate)
+        generated_image = Image.open(BytesIO(image_data))
         
         # Convert to grayscale for thermal printing
         grayscale_image = generated_image.convert('L')
         
-        return grayscale_image
+        return grayscale_image, image_data
         
     except Exception as e:
         error_msg = str(e)
@@ -126,20 +203,17 @@ def generate_image(prompt: str) -> Image.Image:
             raise RuntimeError(f"Image generation failed: {error_msg}")
 
 
-def generate_image_base64(prompt: str) -> str:
+def generate_image_base64(prompt: str, regenerate: bool = False) -> str:
     """
-    Generate image and return as base64-encoded PNG.
+    Generate image and return it base64-encoded.
     
     Args:
         prompt: Text description of the image
+        regenerate: Ask Gemini for a new image even if this prompt is cached
         
     Returns:
-        Base64-encoded PNG image string
+        Base64-encoded image string (the bytes Gemini returned, not re-encoded)
     """
-    image = generate_image(prompt)
-    
-    buffer = BytesIO()
-    image.save(buffer, format='PNG')
-    buffer.seek(0)
+    _, image_data = generate_image(prompt, regenerate)
     
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    return base64.b64encode(image_data).decode('utf-8')
@@ -2,14 +2,26 @@
 Print Hole - Flask application for thermal printer web interface.
 """
 
-from flask import Flask, render_template, request, jsonify
-import base64
+from flask import Flask, Response, render_template, request, jsonify
+from flask.json.provider import JSONProvider
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from io import BytesIO
+from typing import Tuple
+
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 from PIL import Image
 from image_processor import (
     process_image,
     image_to_base64,
+    image_to_bytes,
     base64_to_image,
     RotationMode,
     PRINT_WIDTH_DOTS,
@@ -22,13 +34,201 @@ from markdown_printer import (
     FontSize
 )
 from printer import get_printer, ROLLO_PRINT_WIDTH_DOTS as ROLLO_WIDTH, ROLLO_DPI as ROLLO_PRINTER_DPI
-from ai_generator import generate_image, generate_image_base64
+from ai_generator import generate_image
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (much faster on large base64 strings)."""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+# Compress larger JSON responses (base64 previews) when flask-compress is installed
+if Compress is not None:
+    app.config.update(
+        COMPRESS_ALGORITHM=['br', 'gzip'],
+        COMPRESS_MIN_SIZE=2048,
+        COMPRESS_LEVEL=4,
+        COMPRESS_BR_LEVEL=4
+    )
+    Compress(app)
 
 # Maximum print length warning threshold (inches)
 MAX_LENGTH_INCHES = 12.0
 
+# Accepted request option values
+FONT_SIZES = frozenset({'small', 'medium', 'large'})
+ROTATION_MODES = frozenset({'auto', 'original', 'square'})
+PRINTER_TYPES = frozenset({'usb', 'rollo'})
+
+
+def _get_font_size(data: dict) -> str:
+    """Read fontSize from request data, defaulting to 'small'."""
+    font_size = data.get('fontSize', 'small')
+    return font_size if font_size in FONT_SIZES else 'small'
+
+
+def _get_rotation(data: dict) -> RotationMode:
+    """Read rotation from request data, defaulting to auto."""
+    rotation = data.get('rotation', 'auto')
+    return RotationMode(rotation if rotation in ROTATION_MODES else 'auto')
+
+
+def _preview_text(data: dict, content: str) -> Tuple[str, float]:
+    """Render markdown text to a base64 preview."""
+    preview_image, length_inches = generate_preview(content, _get_font_size(data))
+    return preview_to_base64(preview_image), length_inches
+
+
+def _preview_image(data: dict, content: str) -> Tuple[str, float]:
+    """Process a base64 image into a base64 1-bit preview."""
+    image = base64_to_image(content)
+    processed_image, length_inches = process_image(image, _get_rotation(data))
+    return image_to_base64(processed_image), length_inches
+
+
+# Preview handlers by mode; AI images are previewed by /api/generate instead
+PREVIEW_HANDLERS = {
+    'text': _preview_text,
+    'image': _preview_image,
+}
+
+# Processed AI images kept for printing, keyed by the token sent to the
+# client: {token: (created, rotation, processed_image)}. Per-process, so a
+# miss (other worker, expired, rotation changed) falls back to the content.
+GENERATED_CACHE_SIZE = 16
+GENERATED_CACHE_TTL = 300.0
+_generated_cache = OrderedDict()
+_generated_cache_lock = threading.Lock()
+
+
+def _remember_generated(rotation: RotationMode, processed_image: Image.Image) -> str:
+    """Cache a processed AI image and return its token."""
+    token = secrets.token_urlsafe(12)
+    with _generated_cache_lock:
+        _generated_cache[token] = (time.monotonic(), rotation, processed_image)
+        if len(_generated_cache) > GENERATED_CACHE_SIZE:
+            _generated_cache.popitem(last=False)
+    return token
+
+
+def _recall_generated(token: str, rotation: RotationMode):
+    """Return the cached processed image for token, or None if unusable."""
+    if not token:
+        return None
+    with _generated_cache_lock:
+        entry = _generated_cache.get(token)
+    if entry is None:
+        return None
+    created, cached_rotation, processed_image = entry
+    if cached_rotation != rotation or time.monotonic() - created > GENERATED_CACHE_TTL:
+        return None
+    return processed_image
+
+
+# Recently rendered previews, keyed by ETag: {etag: (preview_base64, length_inches)}
+PREVIEW_CACHE_SIZE = 64
+_preview_cache = OrderedDict()
+_preview_cache_lock = threading.Lock()
+
+
+def _preview_etag(mode: str, data: dict, content: str) -> str:
+    """Hash every input that affects a preview into an ETag value."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{mode}|{_get_font_size(data)}|{_get_rotation(data).value}|'.encode('utf-8'))
+    digest.update(content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _etag_matches(etag: str) -> bool:
+    """Check If-None-Match, ignoring the ':br'/':gzip' suffix flask-compress adds."""
+    tags = request.if_none_match.as_set(include_weak=True)
+    return any(tag.split(':', 1)[0] == etag for tag in tags)
+
+
+def _cached_preview(etag: str, handler, data: dict, content: str) -> Tuple[str, float]:
+    """Return the preview for etag, rendering and caching it on a miss."""
+    with _preview_cache_lock:
+        if etag in _preview_cache:
+            _preview_cache.move_to_end(etag)
+            return _preview_cache[etag]
+    
+    result = handler(data, content)
+    
+    with _preview_cache_lock:
+        _preview_cache[etag] = result
+        if len(_preview_cache) > PREVIEW_CACHE_SIZE:
+            _preview_cache.popitem(last=False)
+    
+    return result
+
+
+def _print_text(printer, printer_type: str, data: dict, content: str) -> Tuple[bool, str]:
+    """Print markdown text as ESC/POS text, or as an image on the Rollo."""
+    font_size = _get_font_size(data)
+    
+    if printer_type == 'rollo':
+        # Rollo requires image-based printing, render text as image
+        preview_image, _ = generate_preview(content, font_size)
+        # Scale to Rollo width
+        if preview_image.width > ROLLO_WIDTH:
+            ratio = ROLLO_WIDTH / preview_image.width
+            new_height = int(preview_image.height * ratio)
+            preview_image = preview_image.resize((ROLLO_WIDTH, new_height), Image.Resampling.BILINEAR)
+        return printer.print_image(preview_image)
+    
+    commands, _ = parse_markdown(content, font_size)
+    return printer.print_text_commands(commands)
+
+
+def _print_image(printer, printer_type: str, data: dict, content: str) -> Tuple[bool, str]:
+    """Process and print a base64 image (uploaded or AI-generated)."""
+    image = base64_to_image(content)
+    processed_image, _ = process_image(image, _get_rotation(data))
+    return printer.print_image(processed_image)
+
+
+def _print_ai_image(printer, printer_type: str, data: dict, content: str) -> Tuple[bool, str]:
+    """Print an AI image, reusing the image processed at generation when possible."""
+    processed_image = _recall_generated(data.get('imageToken'), _get_rotation(data))
+    if processed_image is None:
+        return _print_image(printer, printer_type, data, content)
+    return printer.print_image(processed_image)
+
+
+def _print_drawing(printer, printer_type: str, data: dict, content: str) -> Tuple[bool, str]:
+    """Print a canvas data URL without rotation."""
+    image = base64_to_image(content)
+    processed_image, _ = process_image(image, RotationMode.ORIGINAL)
+    return printer.print_image(processed_image)
+
+
+# Print handlers by mode; unknown modes are treated as images
+PRINT_HANDLERS = {
+    'text': _print_text,
+    'image': _print_image,
+    'ai': _print_ai_image,
+    'draw': _print_drawing,
+}
+
 
 @app.route('/')
 def index():
@@ -55,6 +255,8 @@ def preview():
         "lengthInches": float,
         "warning": bool (true if > 12 inches)
     }
+    
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
     """
     try:
         data = request.get_json()
@@ -68,30 +270,8 @@ def preview():
                 'warning': False
             })
         
-        if mode == 'text':
-            # Process markdown text
-            font_size = data.get('fontSize', 'small')
-            if font_size not in ('small', 'medium', 'large'):
-                font_size = 'small'
-            
-            preview_image, length_inches = generate_preview(content, font_size)
-            preview_base64 = preview_to_base64(preview_image)
-        
-        elif mode == 'image':
-            # Process image
-            rotation = data.get('rotation', 'auto')
-            if rotation not in ('auto', 'original', 'square'):
-                rotation = 'auto'
-            
-            # Decode base64 image
-            image = base64_to_image(content)
-            
-            # Process image
-            rotation_mode = RotationMode(rotation)
-            processed_image, length_inches = process_image(image, rotation_mode)
-            preview_base64 = image_to_base64(processed_image)
-        
-        else:  # mode == 'ai'
+        handler = PREVIEW_HANDLERS.get(mode)
+        if handler is None:  # mode == 'ai'
             # AI-generated images are previewed after generation
             # Return empty preview - user must click Generate first
             return jsonify({
@@ -101,11 +281,22 @@ def preview():
                 'message': 'Click Generate to create an image from your prompt'
             })
         
-        return jsonify({
-            'preview': preview_base64,
-            'lengthInches': round(length_inches, 2),
-            'warning': length_inches > MAX_LENGTH_INCHES
-        })
+        # Identical input yields an identical preview: let the client
+        # revalidate with If-None-Match and reuse server-side renders
+        etag = _preview_etag(mode, data, content)
+        if _etag_matches(etag):
+            response = app.response_class(status=304)
+        else:
+            preview_base64, length_inches = _cached_preview(etag, handler, data, content)
+            response = jsonify({
+                'preview': preview_base64,
+                'lengthInches': round(length_inches, 2),
+                'warning': length_inches > MAX_LENGTH_INCHES
+            })
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        return response
     
     except Exception as e:
         return jsonify({
@@ -124,7 +315,8 @@ def print_content():
         "content": string (markdown text or base64 image),
         "fontSize": "small" | "medium" | "large" (for text mode),
         "rotation": "auto" | "original" | "square" (for image mode),
-        "printer": "usb" | "rollo" (optional, default "usb")
+        "printer": "usb" | "rollo" (optional, default "usb"),
+        "imageToken": string (optional, ai mode; from /api/generate)
     }
     
     Response JSON:
@@ -139,7 +331,7 @@ def print_content():
         content = data.get('content', '')
         printer_type = data.get('printer', 'usb')
         
-        if printer_type not in ('usb', 'rollo'):
+        if printer_type not in PRINTER_TYPES:
             printer_type = 'usb'
         
         if not content:
@@ -149,55 +341,8 @@ def print_content():
             })
         
         printer = get_printer(printer_type)
-        
-        if mode == 'text':
-            # Parse markdown and send ESC/POS commands
-            font_size = data.get('fontSize', 'small')
-            if font_size not in ('small', 'medium', 'large'):
-                font_size = 'small'
-            
-            if printer_type == 'rollo':
-                # Rollo requires image-based printing, render text as image
-                preview_image, _ = generate_preview(content, font_size)
-                # Scale to Rollo width
-                if preview_image.width > ROLLO_WIDTH:
-                    ratio = ROLLO_WIDTH / preview_image.width
-                    new_height = int(preview_image.height * ratio)
-                    preview_image = preview_image.resize((ROLLO_WIDTH, new_height), Image.Resampling.LANCZOS)
-                success, error = printer.print_image(preview_image)
-            else:
-                commands, _ = parse_markdown(content, font_size)
-                success, error = printer.print_text_commands(commands)
-        
-        elif mode == 'ai':
-            # For AI mode, content is already base64 image data from generation
-            rotation = data.get('rotation', 'auto')
-            if rotation not in ('auto', 'original', 'square'):
-                rotation = 'auto'
-            
-            image = base64_to_image(content)
-            rotation_mode = RotationMode(rotation)
-            processed_image, _ = process_image(image, rotation_mode)
-            success, error = printer.print_image(processed_image)
-        
-        elif mode == 'draw':
-            # For draw mode, content is canvas data URL
-            image = base64_to_image(content)
-            rotation_mode = RotationMode('original')
-            processed_image, _ = process_image(image, rotation_mode)
-            success, error = printer.print_image(processed_image)
-        
-        else:  # mode == 'image'
-            # Process and print image
-            rotation = data.get('rotation', 'auto')
-            if rotation not in ('auto', 'original', 'square'):
-                rotation = 'auto'
-            
-            image = base64_to_image(content)
-            rotation_mode = RotationMode(rotation)
-            processed_image, _ = process_image(image, rotation_mode)
-            
-            success, error = printer.print_image(processed_image)
+        handler = PRINT_HANDLERS.get(mode, _print_image)
+        success, error = handler(printer, printer_type, data, content)
         
         return jsonify({
             'success': success,
@@ -211,6 +356,85 @@ def print_content():
         }), 500
 
 
+def _generate_for_request(data: dict) -> Tuple[bytes, Image.Image, float, str]:
+    """
+    Generate an image for a /api/generate* request and process it for printing.
+    
+    Returns:
+        Tuple of (original image bytes, processed 1-bit image, length in inches,
+        token for printing the processed image without reprocessing)
+    
+    Raises:
+        ValueError: If the prompt is empty or the API key is missing
+        RuntimeError: If image generation fails
+    """
+    prompt = data.get('prompt', '').strip()
+    
+    if not prompt:
+        raise ValueError('Prompt cannot be empty')
+    
+    # Generate image from prompt, keeping it in-process for the preview. An
+    # explicit Generate click sends regenerate, since the only reason to
+    # click again with the same prompt is to get a different image
+    image, image_data = generate_image(prompt, regenerate=data.get('regenerate') is True)
+    
+    # Process for print preview
+    rotation = _get_rotation(data)
+    processed_image, length_inches = process_image(image, rotation)
+    token = _remember_generated(rotation, processed_image)
+    
+    return image_data, processed_image, length_inches, token
+
+
+def _generate_error(e: Exception):
+    """Map a generation failure to a JSON error response."""
+    if isinstance(e, ValueError):
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
+    if isinstance(e, RuntimeError):
+        return jsonify({
+            'error': str(e)
+        }), 500
+    
+    return jsonify({
+        'error': f'Failed to generate image: {str(e)}'
+    }), 500
+
+
+def _multipart_response(fields: dict, files: dict) -> Response:
+    """
+    Build a multipart/form-data response.
+    
+    Args:
+        fields: {name: value} text parts
+        files: {name: (filename, mimetype, bytes)} binary parts
+    """
+    boundary = secrets.token_hex(16)
+    body = bytearray()
+    
+    for name, value in fields.items():
+        body += (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f'{value}\r\n'
+        ).encode('utf-8')
+    
+    for name, (filename, mimetype, payload) in files.items():
+        body += (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {mimetype}\r\n\r\n'
+        ).encode('utf-8')
+        body += payload
+        body += b'\r\n'
+    
+    body += f'--{boundary}--\r\n'.encode('utf-8')
+    
+    return Response(bytes(body), mimetype=f'multipart/form-data; boundary={boundary}')
+
+
 @app.route('/api/generate', methods=['POST'])
 def generate_ai_image():
     """
@@ -225,54 +449,63 @@ def generate_ai_image():
     Response JSON:
     {
         "image": string (base64 PNG),
+        "imageToken": string (pass to /api/print to skip reprocessing),
         "preview": string (base64 PNG, processed for printing),
         "lengthInches": float,
         "warning": bool
     }
     """
     try:
-        data = request.get_json()
-        prompt = data.get('prompt', '').strip()
-        
-        if not prompt:
-            return jsonify({
-                'error': 'Prompt cannot be empty'
-            }), 400
-        
-        # Generate image from prompt
-        image_base64 = generate_image_base64(prompt)
-        
-        # Process for print preview
-        rotation = data.get('rotation', 'auto')
-        if rotation not in ('auto', 'original', 'square'):
-            rotation = 'auto'
-        
-        image = base64_to_image(image_base64)
-        rotation_mode = RotationMode(rotation)
-        processed_image, length_inches = process_image(image, rotation_mode)
-        preview_base64 = image_to_base64(processed_image)
+        image_data, processed_image, length_inches, token = _generate_for_request(request.get_json())
         
         return jsonify({
-            'image': image_base64,
-            'preview': preview_base64,
+            'image': base64.b64encode(image_data).decode('utf-8'),
+            'imageToken': token,
+            'preview': image_to_base64(processed_image),
             'lengthInches': round(length_inches, 2),
             'warning': length_inches > MAX_LENGTH_INCHES
         })
     
-    except ValueError as e:
-        return jsonify({
-            'error': str(e)
-        }), 400
+    except Exception as e:
+        return _generate_error(e)
+
+
+@app.route('/api/generate_binary', methods=['POST'])
+def generate_ai_image_binary():
+    """
+    Generate an image like /api/generate, returning the images as binary parts.
     
-    except RuntimeError as e:
-        return jsonify({
-            'error': str(e)
-        }), 500
+    Avoids base64-encoding both PNGs on the server and inflating the
+    response by a third; browsers parse it with Response.formData().
+    
+    Request JSON: same as /api/generate
+    
+    Response multipart/form-data:
+        image: original PNG
+        preview: PNG processed for printing
+        imageToken: string (pass to /api/print to skip reprocessing)
+        lengthInches: float
+        warning: "true" | "false"
+    
+    Errors are returned as JSON, same as /api/generate.
+    """
+    try:
+        image_data, processed_image, length_inches, token = _generate_for_request(request.get_json())
+        
+        return _multipart_response(
+            {
+                'imageToken': token,
+                'lengthInches': round(length_inches, 2),
+                'warning': 'true' if length_inches > MAX_LENGTH_INCHES else 'false'
+            },
+            {
+                'image': ('image.png', 'image/png', image_data),
+                'preview': ('preview.png', 'image/png', image_to_bytes(processed_image))
+            }
+        )
     
     except Exception as e:
-        return jsonify({
-            'error': f'Failed to generate image: {str(e)}'
-        }), 500
+        return _generate_error(e)
 
 
 if __name__ == '__main__':
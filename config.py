@@ -0,0 +1,51 @@
+"""
+Configuration loader for ~/.print-hole.conf.
+"""
+
+import configparser
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+CONFIG_PATH = Path.home() / '.print-hole.conf'
+
+
+@lru_cache(maxsize=4)
+def _parse_config(path: str, mtime_ns: int) -> Dict[str, Dict[str, str]]:
+    """
+    Parse a config file; cached per (path, modification time).
+    
+    OSError propagates rather than being cached as an empty config, since a
+    permissions fix does not change the mtime.
+    """
+    parser = configparser.ConfigParser()
+    with open(path, encoding='utf-8') as f:
+        parser.read_file(f)
+    
+    return {section: dict(parser.items(section)) for section in parser.sections()}
+
+
+def load_config() -> Dict[str, Dict[str, str]]:
+    """
+    Read ~/.print-hole.conf into plain dicts.
+    
+    The file is only re-parsed when its modification time changes, so each
+    call costs a single stat(). The result is shared between callers, so
+    treat it as read-only.
+    
+    Returns:
+        Mapping of section name to {option: value}; empty if the file is missing
+    """
+    try:
+        mtime_ns = os.stat(CONFIG_PATH).st_mtime_ns
+        return _parse_config(str(CONFIG_PATH), mtime_ns)
+    except OSError:
+        # Missing or unreadable; treat it as empty, as ConfigParser.read() did
+        return {}
+
+
+def reload_config() -> Dict[str, Dict[str, str]]:
+    """Drop the cached config and read ~/.print-hole.conf again."""
+    _parse_config.cache_clear()
+    return load_config()
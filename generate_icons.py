@@ -8,6 +8,8 @@ import os
 from PIL import Image, ImageDraw
 
 ICON_SIZES = [72, 96, 128, 144, 152, 192, 384, 512]
+# Drawing coordinates below are in MASTER_SIZE units, scaled to each size
+MASTER_SIZE = 512
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ICONS_DIR = os.path.join(SCRIPT_DIR, 'static', 'icons')
 
@@ -18,87 +20,58 @@ LIGHT_GRAY = (233, 236, 239, 255)
 DARK_GRAY = (52, 58, 64, 255)
 GREEN = (40, 167, 69, 255)
 
+# Receipt line boxes (left, top, right, bottom, color) at MASTER_SIZE
+RECEIPT_LINES = (
+    (176, 360, 272, 368, BLUE),
+    (176, 380, 336, 386, LIGHT_GRAY),
+    (176, 396, 316, 402, LIGHT_GRAY),
+    (176, 412, 296, 418, LIGHT_GRAY),
+    (176, 428, 256, 434, LIGHT_GRAY),
+)
+
 
 def draw_icon(size: int) -> Image.Image:
-    """Draw a printer icon at the specified size."""
+    """
+    Draw the printer icon natively at the given size.
+    
+    Drawing each size (rather than downsampling one large icon) keeps edges
+    hard and the image down to a handful of flat colors, which index into a
+    much smaller PNG than antialiased RGBA.
+    """
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
     # Scale factor
-    s = size / 512
+    s = size / MASTER_SIZE
+    
+    def box(left, top, right, bottom):
+        return [(int(left * s), int(top * s)), (int(right * s), int(bottom * s))]
     
     # Background with rounded corners
-    corner_radius = int(64 * s)
     draw.rounded_rectangle(
         [(0, 0), (size - 1, size - 1)],
-        radius=corner_radius,
+        radius=int(64 * s),
         fill=BLUE
     )
     
     # Printer body
-    body_left = int(96 * s)
-    body_top = int(192 * s)
-    body_right = int(416 * s)
-    body_bottom = int(352 * s)
-    body_radius = int(16 * s)
-    draw.rounded_rectangle(
-        [(body_left, body_top), (body_right, body_bottom)],
-        radius=body_radius,
-        fill=WHITE
-    )
+    draw.rounded_rectangle(box(96, 192, 416, 352), radius=int(16 * s), fill=WHITE)
     
     # Paper input (top section)
-    paper_in_left = int(128 * s)
-    paper_in_top = int(96 * s)
-    paper_in_right = int(384 * s)
-    paper_in_bottom = int(208 * s)
-    draw.rounded_rectangle(
-        [(paper_in_left, paper_in_top), (paper_in_right, paper_in_bottom)],
-        radius=int(8 * s),
-        fill=LIGHT_GRAY
-    )
+    draw.rounded_rectangle(box(128, 96, 384, 208), radius=int(8 * s), fill=LIGHT_GRAY)
     
     # Inner paper
-    inner_left = int(144 * s)
-    inner_top = int(112 * s)
-    inner_right = int(368 * s)
-    inner_bottom = int(192 * s)
-    draw.rounded_rectangle(
-        [(inner_left, inner_top), (inner_right, inner_bottom)],
-        radius=int(4 * s),
-        fill=WHITE
-    )
+    draw.rounded_rectangle(box(144, 112, 368, 192), radius=int(4 * s), fill=WHITE)
     
     # Receipt output
-    receipt_left = int(160 * s)
-    receipt_top = int(336 * s)
-    receipt_right = int(352 * s)
-    receipt_bottom = int(464 * s)
-    draw.rounded_rectangle(
-        [(receipt_left, receipt_top), (receipt_right, receipt_bottom)],
-        radius=int(4 * s),
-        fill=WHITE
-    )
+    draw.rounded_rectangle(box(160, 336, 352, 464), radius=int(4 * s), fill=WHITE)
     
     # Receipt lines
-    line_left = int(176 * s)
-    line_widths = [96, 160, 140, 120, 80]
-    line_tops = [360, 380, 396, 412, 428]
-    line_heights = [8, 6, 6, 6, 6]
-    line_colors = [BLUE, LIGHT_GRAY, LIGHT_GRAY, LIGHT_GRAY, LIGHT_GRAY]
-    
-    for width, top, height, color in zip(line_widths, line_tops, line_heights, line_colors):
-        draw.rounded_rectangle(
-            [(int(line_left), int(top * s)), 
-             (int(line_left + width * s), int((top + height) * s))],
-            radius=int(2 * s),
-            fill=color
-        )
+    for left, top, right, bottom, color in RECEIPT_LINES:
+        draw.rounded_rectangle(box(left, top, right, bottom), radius=int(2 * s), fill=color)
     
     # Status light
-    light_cx = int(384 * s)
-    light_cy = int(240 * s)
-    light_r = int(12 * s)
+    light_cx, light_cy, light_r = int(384 * s), int(240 * s), int(12 * s)
     draw.ellipse(
         [(light_cx - light_r, light_cy - light_r),
          (light_cx + light_r, light_cy + light_r)],
@@ -106,10 +79,8 @@ def draw_icon(size: int) -> Image.Image:
     )
     
     # Paper slot (dark ellipse)
-    slot_cx = int(256 * s)
-    slot_cy = int(280 * s)
-    slot_rx = int(48 * s)
-    slot_ry = int(16 * s)
+    slot_cx, slot_cy = int(256 * s), int(280 * s)
+    slot_rx, slot_ry = int(48 * s), int(16 * s)
     draw.ellipse(
         [(slot_cx - slot_rx, slot_cy - slot_ry),
          (slot_cx + slot_rx, slot_cy + slot_ry)],
@@ -119,15 +90,29 @@ def draw_icon(size: int) -> Image.Image:
     return img
 
 
+def save_icon(size: int) -> str:
+    """Draw the icon at one size and write it to ICONS_DIR."""
+    filename = f'icon-{size}.png'
+    
+    # The icon has only a few flat colors, so a palette (with alpha) of
+    # exactly that many entries holds it losslessly in far fewer bytes than
+    # RGBA; a full 256-entry palette would cost more than it saves
+    img = draw_icon(size)
+    colors = img.getcolors(256)
+    if colors is not None:
+        img = img.quantize(len(colors), method=Image.Quantize.FASTOCTREE)
+    
+    # A single fixed zlib level instead of optimize=True's encoder search
+    img.save(os.path.join(ICONS_DIR, filename), 'PNG', optimize=False, compress_level=9)
+    return filename
+
+
 def generate_icons():
     """Generate PNG icons at various sizes."""
     os.makedirs(ICONS_DIR, exist_ok=True)
     
     for size in ICON_SIZES:
-        output_path = os.path.join(ICONS_DIR, f'icon-{size}.png')
-        img = draw_icon(size)
-        img.save(output_path, 'PNG', optimize=True)
-        print(f"Generated: icon-{size}.png")
+        print(f"Generated: {save_icon(size)}")
     
     print(f"\nAll icons generated in {ICONS_DIR}")
 
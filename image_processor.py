@@ -5,8 +5,15 @@ Handles resizing, rotation modes, and 1-bit dithering.
 
 from PIL import Image
 from enum import Enum
+from io import BytesIO
 from typing import Tuple
 
+# Use SIMD-accelerated base64 when available
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 # Printer specifications
 PRINT_WIDTH_DOTS = 576
 DPI = 203
@@ -37,10 +44,31 @@ def center_crop_square(image: Image.Image) -> Image.Image:
     return image.crop((left, top, right, bottom))
 
 
+def draft_for_width(image: Image.Image, target_width: int, mode: str = None) -> Image.Image:
+    """
+    Let JPEG sources decode at a reduced scale (1/2, 1/4, 1/8) when they are
+    much larger than needed. No-op for other formats or already-loaded images.
+    
+    The shorter side is kept at >= 2x target_width, so the later LANCZOS
+    resize still has headroom whichever way the image is rotated or cropped.
+    Passing mode='L' also lets color JPEGs decode straight to grayscale.
+    """
+    width, height = image.size
+    min_side = 2 * target_width
+    shorter = min(width, height)
+    if shorter > min_side:
+        size = (width * min_side // shorter, height * min_side // shorter)
+    else:
+        size = None
+    image.draft(mode or image.mode, size)
+    return image
+
+
 def process_image(
     image: Image.Image,
     rotation: RotationMode = RotationMode.AUTO,
-    target_width: int = PRINT_WIDTH_DOTS
+    target_width: int = PRINT_WIDTH_DOTS,
+    dither: bool = True
 ) -> Tuple[Image.Image, float]:
     """
     Process image for thermal printer output.
@@ -49,41 +77,56 @@ def process_image(
         image: Input PIL Image
         rotation: Rotation mode (AUTO, ORIGINAL, SQUARE)
         target_width: Target width in pixels (default 576 for 80mm printer)
+        dither: Floyd-Steinberg dither to 1-bit; False thresholds at 50%
+            (crisper for line art and text)
     
     Returns:
         Tuple of (processed 1-bit image, estimated print length in inches)
     """
-    # Convert to RGB if necessary (handles RGBA, palette, etc.)
+    # Decode large JPEGs at reduced scale (and in grayscale) before
+    # anything touches the pixels
+    image = draft_for_width(image, target_width, 'L')
+    
+    # Everything below runs in grayscale: 1 byte/pixel for crop, rotate and
+    # resize instead of 3
     if image.mode in ('RGBA', 'LA'):
-        # Create white background for transparent images
-        background = Image.new('RGB', image.size, (255, 255, 255))
-        if image.mode == 'RGBA':
-            background.paste(image, mask=image.split()[3])
-        else:
-            background.paste(image, mask=image.split()[1])
+        # Composite onto white directly in grayscale
+        background = Image.new('L', image.size, 255)
+        background.paste(image.convert('L'), mask=image.getchannel('A'))
         image = background
-    elif image.mode != 'RGB':
-        image = image.convert('RGB')
+    elif image.mode != 'L':
+        image = image.convert('L')
     
     # Apply rotation mode
+    rotate = False
     if rotation == RotationMode.SQUARE:
         image = center_crop_square(image)
     elif rotation == RotationMode.AUTO:
         # Rotate landscape images (wider than tall) 90° so the longer dimension
         # prints along the paper length, maximizing the printed image size
-        if image.width > image.height:
-            image = image.rotate(90, expand=True)
+        rotate = image.width > image.height
     # ORIGINAL mode: no rotation
     
-    # Resize to target width, maintaining aspect ratio
-    if image.width != target_width:
-        ratio = target_width / image.width
-        new_height = int(image.height * ratio)
-        image = image.resize((target_width, new_height), Image.Resampling.LANCZOS)
-    
-    # Convert to grayscale then 1-bit with Floyd-Steinberg dithering
-    image = image.convert('L')  # Grayscale
-    image = image.convert('1')  # 1-bit with dithering (default)
+    # Resize so the printed width is target_width, maintaining aspect ratio.
+    # When rotating, resize first (the current height becomes the width) so
+    # the rotation only touches the downscaled pixels
+    width, height = (image.height, image.width) if rotate else image.size
+    if width != target_width:
+        ratio = target_width / width
+        new_size = (target_width, int(height * ratio))
+        if rotate:
+            new_size = new_size[::-1]
+        # reducing_gap box-reduces big downscales to ~3x the target before
+        # the LANCZOS pass; no effect when upscaling
+        image = image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    if rotate:
+        image = image.transpose(Image.Transpose.ROTATE_90)
+    
+    # 1-bit, either Floyd-Steinberg dithered or a plain threshold
+    if dither:
+        image = image.convert('1')
+    else:
+        image = image.convert('1', dither=Image.Dither.NONE)
     
     # Calculate print length in inches
     length_inches = image.height / DPI
@@ -94,7 +137,8 @@ def process_image(
 def process_image_from_bytes(
     image_data: bytes,
     rotation: str = "auto",
-    target_width: int = PRINT_WIDTH_DOTS
+    target_width: int = PRINT_WIDTH_DOTS,
+    dither: bool = True
 ) -> Tuple[Image.Image, float]:
     """
     Process image from raw bytes.
@@ -103,37 +147,35 @@ def process_image_from_bytes(
         image_data: Raw image bytes (PNG, JPEG, etc.)
         rotation: Rotation mode string ("auto", "original", "square")
         target_width: Target width in pixels
+        dither: Floyd-Steinberg dither (True) or threshold (False)
     
     Returns:
         Tuple of (processed 1-bit image, estimated print length in inches)
     """
-    from io import BytesIO
-    
     image = Image.open(BytesIO(image_data))
     
     # Convert rotation string to enum
     rotation_mode = RotationMode(rotation.lower())
     
-    return process_image(image, rotation_mode, target_width)
+    return process_image(image, rotation_mode, target_width, dither)
 
 
-def image_to_base64(image: Image.Image, format: str = 'PNG') -> str:
-    """Convert PIL Image to base64 string."""
-    from io import BytesIO
-    import base64
-    
+def image_to_bytes(image: Image.Image, format: str = 'PNG') -> bytes:
+    """Encode PIL Image to bytes (PNG by default)."""
     buffer = BytesIO()
-    image.save(buffer, format=format)
-    buffer.seek(0)
+    # Fast zlib setting: these PNGs are transient previews, not archives
+    image.save(buffer, format=format, compress_level=1)
     
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    return buffer.getvalue()
+
+
+def image_to_base64(image: Image.Image, format: str = 'PNG') -> str:
+    """Convert PIL Image to base64 string."""
+    return base64.b64encode(image_to_bytes(image, format)).decode('utf-8')
 
 
 def base64_to_image(base64_string: str) -> Image.Image:
     """Convert base64 string to PIL Image."""
-    from io import BytesIO
-    import base64
-    
     # Handle data URL format
     if ',' in base64_string:
         base64_string = base64_string.split(',', 1)[1]
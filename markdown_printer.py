@@ -4,10 +4,15 @@ Parses Markdown and generates native ESC/POS commands for thermal printer.
 """
 
 import re
+from functools import lru_cache
 from typing import List, Tuple
 from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
-import base64
+
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 # Printer specifications
 PRINT_WIDTH_DOTS = 576
@@ -34,6 +39,10 @@ CMD_UNDERLINE_ON = b'\x1b\x2d\x01'
 CMD_UNDERLINE_OFF = b'\x1b\x2d\x00'
 CMD_DEFAULT_SPACING = b'\x1b\x32'
 
+# Command tags used by MarkdownToPrinter
+TAG_RAW = 0   # payload is ESC/POS bytes
+TAG_TEXT = 1  # payload is a str
+
 # Font size presets
 class FontSize:
     SMALL = 'small'     # 1x - normal
@@ -41,35 +50,42 @@ class FontSize:
     LARGE = 'large'     # 2x width + height
 
 
+# Font size -> (ESC/POS command, height multiplier, chars per line)
+_FONT_SETTINGS = {
+    FontSize.SMALL: (CMD_NORMAL, 1, 48),         # Normal, 48 chars/line
+    FontSize.MEDIUM: (CMD_DOUBLE_HEIGHT, 2, 48),  # Double H, 48 chars/line
+    FontSize.LARGE: (CMD_DOUBLE_WH, 2, 24),       # Double W+H, 24 chars/line
+}
+
+# Font size -> preview line height in pixels
+_LINE_HEIGHTS = {
+    FontSize.SMALL: 16,
+    FontSize.MEDIUM: 22,
+    FontSize.LARGE: 28,
+}
+
+
 def get_font_settings(size: str) -> Tuple[bytes, int, int]:
     """
     Get ESC/POS command, char width multiplier, and chars per line for font size.
-    Returns (command, height_multiplier, chars_per_line)
+    Returns (command, height_multiplier, chars_per_line); unknown sizes get SMALL.
     """
-    if size == FontSize.LARGE:
-        return CMD_DOUBLE_WH, 2, 24  # Double W+H, 24 chars/line
-    elif size == FontSize.MEDIUM:
-        return CMD_DOUBLE_HEIGHT, 2, 48  # Double H, 48 chars/line
-    else:  # SMALL
-        return CMD_NORMAL, 1, 48  # Normal, 48 chars/line
+    return _FONT_SETTINGS.get(size, _FONT_SETTINGS[FontSize.SMALL])
 
 
 def word_wrap(text: str, max_chars: int) -> List[str]:
     """Wrap text to fit within max_chars per line."""
-    words = text.split()
     lines = []
-    current_line = []
-    current_length = 0
+    current_line = ''
     
-    for word in words:
+    for word in text.split():
         word_length = len(word)
         
         # If single word is longer than max, split it
         if word_length > max_chars:
             if current_line:
-                lines.append(' '.join(current_line))
-                current_line = []
-                current_length = 0
+                lines.append(current_line)
+                current_line = ''
             
             # Split long word
             for i in range(0, word_length, max_chars):
@@ -77,20 +93,17 @@ def word_wrap(text: str, max_chars: int) -> List[str]:
             continue
         
         # Check if word fits on current line
-        new_length = current_length + word_length + (1 if current_line else 0)
-        
-        if new_length <= max_chars:
-            current_line.append(word)
-            current_length = new_length
+        if not current_line:
+            current_line = word
+        elif len(current_line) + 1 + word_length <= max_chars:
+            current_line += ' ' + word
         else:
             # Start new line
-            if current_line:
-                lines.append(' '.join(current_line))
-            current_line = [word]
-            current_length = word_length
+            lines.append(current_line)
+            current_line = word
     
     if current_line:
-        lines.append(' '.join(current_line))
+        lines.append(current_line)
     
     return lines if lines else ['']
 
@@ -119,10 +132,10 @@ CHAR_SUBSTITUTIONS = {
     '⇒': '=>',
     '⇐': '<=',
     # Quotes
-    '"': '"',
-    '"': '"',
-    ''': "'",
-    ''': "'",
+    '\u201c': '"',  # Left double quote
+    '\u201d': '"',  # Right double quote
+    '\u2018': "'",  # Left single quote
+    '\u2019': "'",  # Right single quote
     '«': '<<',
     '»': '>>',
     # Dashes
@@ -169,48 +182,55 @@ CHAR_SUBSTITUTIONS = {
     '\u2009': ' ',  # Thin space
 }
 
+# Ordinal-keyed table for str.translate, built once at import
+_TRANSLATE_TABLE = str.maketrans(CHAR_SUBSTITUTIONS)
 
+
+@lru_cache(maxsize=256)
 def normalize_text(text: str) -> str:
     """
     Normalize Unicode text for thermal printer compatibility.
     Replaces special characters with ASCII equivalents.
     """
-    # Apply known substitutions
-    for char, replacement in CHAR_SUBSTITUTIONS.items():
-        text = text.replace(char, replacement)
-    
-    # Handle remaining non-ASCII characters
-    result = []
-    for char in text:
-        code = ord(char)
-        if code < 128:
-            # Standard ASCII - keep as-is
-            result.append(char)
-        elif code < 256:
-            # Extended ASCII (128-255) - printer may support some
-            # Try to keep accented Latin characters
-            result.append(char)
-        else:
-            # Unicode beyond Latin-1 - replace with ?
-            result.append('?')
+    # Apply known substitutions in a single pass
+    text = text.translate(_TRANSLATE_TABLE)
     
-    return ''.join(result)
+    # Keep ASCII and Latin-1 (the printer supports some accented
+    # characters); anything beyond Latin-1 becomes '?'
+    return text.encode('latin-1', errors='replace').decode('latin-1')
 
 
 class MarkdownToPrinter:
     """Convert Markdown to ESC/POS commands."""
     
-    def __init__(self, font_size: str = FontSize.SMALL):
+    def __init__(self, font_size: str = FontSize.SMALL, build_preview: bool = False):
         self.font_size = font_size
+        # Style commands only matter to the preview renderer; the CUPS text
+        # queue just takes the text
+        self.build_preview = build_preview
         self.base_cmd, self.height_mult, self.chars_per_line = get_font_settings(font_size)
-        self.commands: List[Tuple[str, any]] = []
+        # Commands are kept as parallel arrays: a tag per command and its payload
+        self.tags = bytearray()
+        self.payloads: List = []
         self.total_dots = 0
         
     def reset(self):
         """Reset state for new document."""
-        self.commands = []
+        self.tags = bytearray()
+        self.payloads = []
         self.total_dots = 0
     
+    def add_raw(self, data: bytes):
+        """Append a raw ESC/POS command (dropped unless building a preview)."""
+        if self.build_preview:
+            self.tags.append(TAG_RAW)
+            self.payloads.append(data)
+    
+    def add_text(self, text: str):
+        """Append printable text."""
+        self.tags.append(TAG_TEXT)
+        self.payloads.append(text)
+    
     def add_line(self, height_dots: int):
         """Track line height for length calculation."""
         self.total_dots += height_dots
@@ -233,55 +253,60 @@ class MarkdownToPrinter:
             height = FONT_A_HEIGHT * 2
         else:
             # H3+: Bold
-            self.commands.append(('raw', CMD_BOLD_ON))
+            self.add_raw(CMD_BOLD_ON)
             lines = word_wrap(text, self.chars_per_line)
             for line in lines:
-                self.commands.append(('text', line + '\n'))
+                self.add_text(line + '\n')
                 self.add_line(FONT_A_HEIGHT * self.height_mult + DEFAULT_LINE_SPACING)
-            self.commands.append(('raw', CMD_BOLD_OFF))
+            self.add_raw(CMD_BOLD_OFF)
             return
         
-        self.commands.append(('raw', cmd))
+        self.add_raw(cmd)
         lines = word_wrap(text, chars)
         for line in lines:
-            self.commands.append(('text', line + '\n'))
+            self.add_text(line + '\n')
             self.add_line(height + DEFAULT_LINE_SPACING)
-        self.commands.append(('raw', self.base_cmd))
+        self.add_raw(self.base_cmd)
     
     def process_paragraph(self, text: str):
         """Process regular paragraph text."""
         lines = word_wrap(text, self.chars_per_line)
         for line in lines:
-            self.commands.append(('text', line + '\n'))
+            self.add_text(line + '\n')
             self.add_line(FONT_A_HEIGHT * self.height_mult + DEFAULT_LINE_SPACING)
     
     def process_bold(self, text: str):
         """Process bold text inline."""
-        self.commands.append(('raw', CMD_BOLD_ON))
-        self.commands.append(('text', text))
-        self.commands.append(('raw', CMD_BOLD_OFF))
+        self.add_raw(CMD_BOLD_ON)
+        self.add_text(text)
+        self.add_raw(CMD_BOLD_OFF)
     
     def process_code(self, text: str):
         """Process inline code or code block using Font B."""
-        self.commands.append(('raw', CMD_FONT_B))
+        self.add_raw(CMD_FONT_B)
         # Font B has 64 chars/line
         lines = word_wrap(text, 64)
         for line in lines:
-            self.commands.append(('text', line + '\n'))
+            self.add_text(line + '\n')
             self.add_line(FONT_B_HEIGHT + DEFAULT_LINE_SPACING)
-        self.commands.append(('raw', CMD_FONT_A))
+        self.add_raw(CMD_FONT_A)
     
     def process_hr(self):
         """Process horizontal rule as dashes."""
-        self.commands.append(('text', '-' * self.chars_per_line + '\n'))
+        self.add_text('-' * self.chars_per_line + '\n')
         self.add_line(FONT_A_HEIGHT * self.height_mult + DEFAULT_LINE_SPACING)
     
     def process_newline(self):
         """Add blank line."""
-        self.commands.append(('text', '\n'))
+        self.add_text('\n')
         self.add_line(DEFAULT_LINE_SPACING)
 
 
+# Token types whose text is stored directly vs. in their children
+_LEAF_TOKEN_TYPES = frozenset({'text', 'codespan'})
+_INLINE_CONTAINER_TYPES = frozenset({'strong', 'emphasis'})
+
+
 def extract_text(tokens) -> str:
     """Extract plain text from mistune tokens."""
     if isinstance(tokens, str):
@@ -296,13 +321,9 @@ def extract_text(tokens) -> str:
             text += token
         elif isinstance(token, dict):
             token_type = token.get('type', '')
-            if token_type == 'text':
-                text += token.get('raw', token.get('text', ''))
-            elif token_type == 'codespan':
+            if token_type in _LEAF_TOKEN_TYPES:
                 text += token.get('raw', token.get('text', ''))
-            elif token_type == 'strong':
-                text += extract_text(token.get('children', []))
-            elif token_type == 'emphasis':
+            elif token_type in _INLINE_CONTAINER_TYPES:
                 text += extract_text(token.get('children', []))
             elif 'children' in token:
                 text += extract_text(token['children'])
@@ -313,7 +334,35 @@ def extract_text(tokens) -> str:
     return text
 
 
-def parse_markdown_simple(text: str, font_size: str = FontSize.SMALL) -> Tuple[List[Tuple], float]:
+# Line-level Markdown patterns used by parse_markdown_simple
+_HR_RE = re.compile(r'^(?:-{3,}|\*{3,}|_{3,})$')
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+_TRAILING_HASHES_RE = re.compile(r'\s*#+\s*$')
+_BOLD_STAR_RE = re.compile(r'\*\*(.+?)\*\*')
+_BOLD_UNDERSCORE_RE = re.compile(r'__(.+?)__')
+_CODE_SPAN_RE = re.compile(r'`(.+?)`')
+
+
+def _strip_inline(text: str) -> str:
+    """Strip **bold**, __bold__ and `code` markers, in that order."""
+    # Most lines carry no markup, and a substring test is far cheaper than a
+    # regex scan, so only run the passes whose marker appears. The passes
+    # stay sequential: markers can interleave, and each pass sees the
+    # previous one's output
+    if '**' in text:
+        text = _BOLD_STAR_RE.sub(r'\1', text)
+    if '__' in text:
+        text = _BOLD_UNDERSCORE_RE.sub(r'\1', text)
+    if '`' in text:
+        text = _CODE_SPAN_RE.sub(r'\1', text)
+    return text
+
+
+def parse_markdown_simple(
+    text: str,
+    font_size: str = FontSize.SMALL,
+    build_preview: bool = False
+) -> Tuple[Tuple[bytearray, List], float]:
     """
     Simple line-by-line Markdown parser for thermal printer.
     
@@ -327,13 +376,11 @@ def parse_markdown_simple(text: str, font_size: str = FontSize.SMALL) -> Tuple[L
     - ``` code blocks ```
     - --- horizontal rules
     """
-    import re
-    
     # Normalize Unicode characters for printer compatibility
     text = normalize_text(text)
     
-    printer = MarkdownToPrinter(font_size)
-    printer.commands.append(('raw', printer.base_cmd))
+    printer = MarkdownToPrinter(font_size, build_preview)
+    printer.add_raw(printer.base_cmd)
     
     lines = text.split('\n')
     in_code_block = False
@@ -369,18 +416,18 @@ def parse_markdown_simple(text: str, font_size: str = FontSize.SMALL) -> Tuple[L
             continue
         
         # Horizontal rule
-        if re.match(r'^-{3,}$|^\*{3,}$|^_{3,}$', line.strip()):
+        if _HR_RE.match(line.strip()):
             printer.process_hr()
             i += 1
             continue
         
         # Headings
-        heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
+        heading_match = _HEADING_RE.match(line)
         if heading_match:
             level = len(heading_match.group(1))
             heading_text = heading_match.group(2).strip()
             # Remove trailing #s if present
-            heading_text = re.sub(r'\s*#+\s*$', '', heading_text)
+            heading_text = _TRAILING_HASHES_RE.sub('', heading_text)
             printer.process_heading(heading_text, level)
             i += 1
             continue
@@ -388,12 +435,8 @@ def parse_markdown_simple(text: str, font_size: str = FontSize.SMALL) -> Tuple[L
         # Regular line - process as single line, respecting line breaks
         line_text = line.strip()
         
-        # Strip bold markers
-        line_text = re.sub(r'\*\*(.+?)\*\*', r'\1', line_text)
-        line_text = re.sub(r'__(.+?)__', r'\1', line_text)
-        
-        # Strip inline code markers
-        line_text = re.sub(r'`(.+?)`', r'\1', line_text)
+        # Strip bold and inline code markers
+        line_text = _strip_inline(line_text)
         
         printer.process_paragraph(line_text)
         i += 1
@@ -402,10 +445,14 @@ def parse_markdown_simple(text: str, font_size: str = FontSize.SMALL) -> Tuple[L
     if code_buffer:
         printer.process_code('\n'.join(code_buffer))
     
-    return printer.commands, printer.get_length_inches()
+    return (printer.tags, printer.payloads), printer.get_length_inches()
 
 
-def parse_markdown(markdown_text: str, font_size: str = FontSize.SMALL) -> Tuple[List[Tuple], float]:
+def parse_markdown(
+    markdown_text: str,
+    font_size: str = FontSize.SMALL,
+    build_preview: bool = False
+) -> Tuple[Tuple[bytearray, List], float]:
     """
     Parse Markdown and convert to ESC/POS commands.
     Uses simple line-based parser for reliability.
@@ -413,11 +460,32 @@ def parse_markdown(markdown_text: str, font_size: str = FontSize.SMALL) -> Tuple
     Args:
         markdown_text: Input Markdown string
         font_size: Font size preset ('small', 'medium', 'large')
+        build_preview: Also emit the style (TAG_RAW) commands the preview
+            renderer needs; printing only uses the text
     
     Returns:
-        Tuple of (list of command tuples, estimated length in inches)
+        Tuple of ((tags, payloads), estimated length in inches), where tags
+        holds TAG_RAW/TAG_TEXT for each entry in payloads
     """
-    return parse_markdown_simple(markdown_text, font_size)
+    return parse_markdown_simple(markdown_text, font_size, build_preview)
+
+
+# Monospace font families for the preview, tried in order: (regular, bold)
+PREVIEW_FONTS = (
+    ('DejaVuSansMono.ttf', 'DejaVuSansMono-Bold.ttf'),
+    ('LiberationMono-Regular.ttf', 'LiberationMono-Bold.ttf'),
+)
+
+
+@lru_cache(maxsize=32)
+def _load_font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """Load a preview font once per (size, weight), falling back to Pillow's default."""
+    for regular, bold_name in PREVIEW_FONTS:
+        try:
+            return ImageFont.truetype(bold_name if bold else regular, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
 
 
 # Preview generation using PIL
@@ -438,59 +506,40 @@ def generate_preview(
         Tuple of (1-bit PIL Image, estimated length in inches)
     """
     # Parse markdown to get structure and length estimate
-    commands, length_inches = parse_markdown(markdown_text, font_size)
+    (tags, payloads), length_inches = parse_markdown(markdown_text, font_size, build_preview=True)
     
     # Calculate image height based on estimated dots
     height = int(length_inches * DPI) + 50  # Add some padding
     height = max(height, 100)  # Minimum height
     
-    # Create image
-    image = Image.new('1', (width, height), 1)  # White background
+    # Draw in 8-bit grayscale (Pillow's fast glyph blit) and threshold to
+    # 1-bit once at the end
+    image = Image.new('L', (width, height), 255)  # White background
     draw = ImageDraw.Draw(image)
     
-    # Try to load a monospace font, fall back to default
-    try:
-        # Try common monospace fonts
-        font_normal = ImageFont.truetype("DejaVuSansMono.ttf", 12)
-        font_bold = ImageFont.truetype("DejaVuSansMono-Bold.ttf", 12)
-        font_small = ImageFont.truetype("DejaVuSansMono.ttf", 10)
-        font_large = ImageFont.truetype("DejaVuSansMono.ttf", 16)
-        font_xlarge = ImageFont.truetype("DejaVuSansMono-Bold.ttf", 20)
-    except:
-        try:
-            font_normal = ImageFont.truetype("LiberationMono-Regular.ttf", 12)
-            font_bold = ImageFont.truetype("LiberationMono-Bold.ttf", 12)
-            font_small = ImageFont.truetype("LiberationMono-Regular.ttf", 10)
-            font_large = ImageFont.truetype("LiberationMono-Regular.ttf", 16)
-            font_xlarge = ImageFont.truetype("LiberationMono-Bold.ttf", 20)
-        except:
-            # Use default font
-            font_normal = ImageFont.load_default()
-            font_bold = font_normal
-            font_small = font_normal
-            font_large = font_normal
-            font_xlarge = font_normal
+    font_normal = _load_font(12)
+    font_bold = _load_font(12, bold=True)
+    font_small = _load_font(10)
+    font_large = _load_font(16)
+    font_xlarge = _load_font(20, bold=True)
     
     # Get base settings
     base_cmd, height_mult, chars_per_line = get_font_settings(font_size)
     
     # Select base font based on size
-    if font_size == FontSize.LARGE:
-        current_font = font_xlarge
-        line_height = 28
-    elif font_size == FontSize.MEDIUM:
-        current_font = font_large
-        line_height = 22
-    else:
-        current_font = font_normal
-        line_height = 16
+    base_font = {
+        FontSize.LARGE: font_xlarge,
+        FontSize.MEDIUM: font_large,
+    }.get(font_size, font_normal)
+    current_font = base_font
+    line_height = _LINE_HEIGHTS.get(font_size, _LINE_HEIGHTS[FontSize.SMALL])
     
     y = 10
     is_bold = False
     is_code = False
     
-    for cmd_type, data in commands:
-        if cmd_type == 'raw':
+    for tag, data in zip(tags, payloads):
+        if tag == TAG_RAW:
             # Handle style changes
             if data == CMD_BOLD_ON:
                 is_bold = True
@@ -501,25 +550,15 @@ def generate_preview(
                 current_font = font_small
             elif data == CMD_FONT_A:
                 is_code = False
-                if font_size == FontSize.LARGE:
-                    current_font = font_xlarge
-                elif font_size == FontSize.MEDIUM:
-                    current_font = font_large
-                else:
-                    current_font = font_normal
+                current_font = base_font
             elif data == CMD_DOUBLE_WH:
                 current_font = font_xlarge
             elif data == CMD_DOUBLE_HEIGHT:
                 current_font = font_large
             elif data in (CMD_NORMAL, base_cmd):
-                if font_size == FontSize.LARGE:
-                    current_font = font_xlarge
-                elif font_size == FontSize.MEDIUM:
-                    current_font = font_large
-                else:
-                    current_font = font_normal
+                current_font = base_font
         
-        elif cmd_type == 'text':
+        else:
             text = data.rstrip('\n')
             if text:
                 font = font_bold if is_bold and not is_code else current_font
@@ -531,6 +570,7 @@ def generate_preview(
     # Crop to actual content height
     final_height = y + 20
     image = image.crop((0, 0, width, final_height))
+    image = image.convert('1', dither=Image.Dither.NONE)
     
     # Recalculate length based on actual height
     length_inches = final_height / DPI
@@ -541,6 +581,6 @@ def generate_preview(
 def preview_to_base64(image: Image.Image) -> str:
     """Convert preview image to base64 PNG string."""
     buffer = BytesIO()
-    image.save(buffer, format='PNG')
+    image.save(buffer, format='PNG', compress_level=1)
     buffer.seek(0)
     return base64.b64encode(buffer.getvalue()).decode('utf-8')
@@ -3,14 +3,26 @@ Printer interface for thermal printers via CUPS.
 Supports Kitchen_MD (markdown), Kitchen_Art (images), and Rollo X1040 (stickers).
 """
 
-import os
 import subprocess
-import tempfile
+import threading
+import time
 import configparser
+from io import BytesIO
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Tuple
 from PIL import Image
 
+from config import load_config
+from image_processor import draft_for_width
+from markdown_printer import TAG_TEXT
+
+# Talk to cupsd directly over IPP when pycups is installed; otherwise shell
+# out to lpstat/lp for every check and job
+try:
+    import cups
+except ImportError:
+    cups = None
+
 
 # Printer specifications (for preview calculations)
 PRINT_WIDTH_DOTS = 576
@@ -28,9 +40,180 @@ DEFAULT_LINE_SPACING = 30
 KITCHEN_MD_PRINTER = 'Kitchen_MD'
 KITCHEN_ART_PRINTER = 'Kitchen_Art'
 
+# Job title shown in the CUPS queue for jobs submitted via pycups
+CUPS_JOB_TITLE = 'print-hole'
+
+# Printer availability is re-checked at most this often (seconds); failures
+# expire sooner so a printer coming back online is noticed quickly
+PRINTER_STATUS_TTL = 30.0
+PRINTER_STATUS_ERROR_TTL = 2.0
+
+# printer name -> (expiry time, (available, error))
+_printer_status_cache: Dict[str, Tuple[float, Tuple[bool, str]]] = {}
+
+# One cupsd connection shared by every check and job, opened on first use
+# and reopened if it goes stale (e.g. cupsd restarted). pycups connections
+# are not thread-safe, so use is serialized
+_cups_lock = threading.Lock()
+_cups_conn = None
+
+
+# Resampling filters selectable with [printer] resample in ~/.print-hole.conf
+RESAMPLE_FILTERS = {
+    'nearest': Image.Resampling.NEAREST,
+    'box': Image.Resampling.BOX,
+    'bilinear': Image.Resampling.BILINEAR,
+    'hamming': Image.Resampling.HAMMING,
+    'bicubic': Image.Resampling.BICUBIC,
+    'lanczos': Image.Resampling.LANCZOS,
+}
+
+
+def _resample_filter(default: Image.Resampling) -> Image.Resampling:
+    """Return the configured [printer] resample filter, or default if unset/unknown."""
+    # An optional tuning knob must never stop a print; fall back on a
+    # malformed or unreadable config file
+    try:
+        config = load_config()
+    except (configparser.Error, OSError, UnicodeDecodeError):
+        return default
+    name = config.get('printer', {}).get('resample', '').strip().lower()
+    return RESAMPLE_FILTERS.get(name, default)
+
+
+def _cups_options(options: list) -> Dict[str, str]:
+    """Convert lp-style 'name=value' (or bare 'name') options to a pycups dict."""
+    result = {}
+    for opt in options or ():
+        name, sep, value = opt.partition('=')
+        result[name] = value if sep else 'true'
+    return result
+
+
+def _is_stale_connection(error: Exception) -> bool:
+    """True if a pycups error means the cupsd connection itself has failed."""
+    if isinstance(error, (RuntimeError, cups.HTTPError)):
+        return True
+    return (
+        isinstance(error, cups.IPPError)
+        and bool(error.args)
+        and error.args[0] == cups.IPP_SERVICE_UNAVAILABLE
+    )
+
+
+def _with_cups(operation):
+    """
+    Run operation(connection) on the shared cupsd connection.
+    
+    Connects lazily; if the connection turns out to be stale, reconnects and
+    retries once. Other errors propagate to the caller. Only errors raised
+    before the operation changed anything on the server may reach here,
+    since the retry runs it again from the start.
+    """
+    global _cups_conn
+    with _cups_lock:
+        for attempt in range(2):
+            if _cups_conn is None:
+                _cups_conn = cups.Connection()
+            try:
+                return operation(_cups_conn)
+            except Exception as e:
+                if attempt or not _is_stale_connection(e):
+                    raise
+                _cups_conn = None
+
+
+def _cancel_job(conn, job_id: int) -> None:
+    """
+    Cancel a half-submitted job so it does not hold the queue until cupsd
+    times it out. Best effort; call with _cups_lock held.
+    """
+    global _cups_conn
+    try:
+        conn.cancelJob(job_id)
+    except Exception as e:
+        if not _is_stale_connection(e):
+            return
+        # The job outlives the connection; cancel it over a fresh one
+        _cups_conn = None
+        try:
+            _cups_conn = cups.Connection()
+            _cups_conn.cancelJob(job_id)
+        except Exception:
+            pass
+
+
+def _ipp_check_printer(printer_name: str) -> Tuple[bool, str]:
+    """Check if a CUPS printer is available by asking cupsd (pycups)."""
+    try:
+        printers = _with_cups(lambda conn: conn.getPrinters())
+    except (RuntimeError, cups.IPPError, cups.HTTPError) as e:
+        return False, f"Error checking printer: {str(e)}"
+    
+    attributes = printers.get(printer_name)
+    if attributes is None:
+        return False, f"Printer '{printer_name}' not found. Check CUPS configuration."
+    if attributes.get('printer-state') == cups.IPP_PRINTER_STOPPED:
+        return False, f"Printer '{printer_name}' is disabled."
+    return True, ""
+
+
+def _ipp_print(printer_name: str, options: list, documents: list) -> Tuple[bool, str]:
+    """
+    Submit a print job of one or more in-memory documents to cupsd (pycups).
+    
+    Each entry of documents becomes one document of a single job, so a batch
+    costs one job (and one filter chain start) rather than one per document.
+    """
+    job_options = _cups_options(options)
+    
+    def submit(conn):
+        # Returns (rather than raises) errors from once the job exists on the
+        # server, so _with_cups() never resubmits it and prints twice.
+        # Failing here is safe to retry: no job was created
+        job_id = conn.createJob(printer_name, CUPS_JOB_TITLE, job_options)
+        try:
+            last = len(documents) - 1
+            for i, data in enumerate(documents):
+                conn.startDocument(
+                    printer_name, job_id, CUPS_JOB_TITLE, cups.CUPS_FORMAT_AUTO, int(i == last)
+                )
+                conn.writeRequestData(data, len(data))
+                conn.finishDocument(printer_name)
+        except Exception as e:
+            _cancel_job(conn, job_id)
+            return e
+        return None
+    
+    try:
+        error = _with_cups(submit)
+        if error is not None:
+            raise error
+        return True, ""
+    except cups.IPPError as e:
+        return False, f"Print failed: {e.args[-1] if e.args else e}"
+    except Exception as e:
+        return False, f"Print error: {str(e)}"
+
 
 def _check_cups_printer(printer_name: str) -> Tuple[bool, str]:
-    """Check if a CUPS printer is available."""
+    """Check if a CUPS printer is available, reusing a recent answer."""
+    now = time.monotonic()
+    cached = _printer_status_cache.get(printer_name)
+    if cached is not None and now < cached[0]:
+        return cached[1]
+    
+    result = _query_cups_printer(printer_name)
+    ttl = PRINTER_STATUS_TTL if result[0] else PRINTER_STATUS_ERROR_TTL
+    _printer_status_cache[printer_name] = (now + ttl, result)
+    return result
+
+
+def _query_cups_printer(printer_name: str) -> Tuple[bool, str]:
+    """Ask CUPS whether a printer exists and is enabled."""
+    if cups is not None:
+        return _ipp_check_printer(printer_name)
+    
     try:
         result = subprocess.run(
             ['lpstat', '-p', printer_name],
@@ -51,24 +234,36 @@ def _check_cups_printer(printer_name: str) -> Tuple[bool, str]:
         return False, f"Error checking printer: {str(e)}"
 
 
-def _print_to_cups(printer_name: str, file_path: str, options: list = None) -> Tuple[bool, str]:
-    """Print a file to a CUPS printer."""
+def _print_to_cups(printer_name: str, data: bytes, options: list = None) -> Tuple[bool, str]:
+    """
+    Print a document to a CUPS printer.
+    
+    Args:
+        printer_name: CUPS queue name
+        data: Document bytes, sent on lp's stdin
+        options: lp -o options
+    
+    Returns:
+        Tuple of (success, error message)
+    """
+    if cups is not None:
+        return _ipp_print(printer_name, options, [data])
+    
     try:
         cmd = ['lp', '-d', printer_name]
         if options:
             for opt in options:
                 cmd.extend(['-o', opt])
-        cmd.append(file_path)
         
         result = subprocess.run(
             cmd,
+            input=data,
             capture_output=True,
-            text=True,
             timeout=30
         )
         
         if result.returncode != 0:
-            return False, f"Print failed: {result.stderr}"
+            return False, f"Print failed: {result.stderr.decode(errors='replace')}"
         
         return True, ""
     except subprocess.TimeoutExpired:
@@ -77,6 +272,44 @@ def _print_to_cups(printer_name: str, file_path: str, options: list = None) -> T
         return False, f"Print error: {str(e)}"
 
 
+def _print_batch_to_cups(printer_name: str, documents: list, options: list = None) -> Tuple[bool, str]:
+    """
+    Print several documents to a CUPS printer.
+    
+    With pycups they go out as one multi-document job; lp can only take one
+    document on stdin, so without it each document is its own job.
+    
+    Args:
+        printer_name: CUPS queue name
+        documents: Document bytes, in print order
+        options: lp -o options, applied to every document
+    
+    Returns:
+        Tuple of (success, error message)
+    """
+    if cups is not None:
+        return _ipp_print(printer_name, options, documents)
+    
+    for data in documents:
+        success, error = _print_to_cups(printer_name, options=options, data=data)
+        if not success:
+            return False, error
+    return True, ""
+
+
+def _encode_for_cups(image: Image.Image) -> bytes:
+    """
+    Encode an image for a CUPS image queue as uncompressed PBM/PGM/PPM.
+    
+    CUPS decodes whatever it is given before rasterizing, so PNG's zlib pass
+    was wasted work; Pillow writes PNM as a near-raw dump of the pixels
+    (under 1 ms for the 812x1218 Rollo canvas vs ~60 ms as PNG).
+    """
+    buffer = BytesIO()
+    image.save(buffer, 'PPM')
+    return buffer.getvalue()
+
+
 class ThermalPrinter:
     """Interface for 80mm USB thermal printer via CUPS queues."""
     
@@ -84,42 +317,84 @@ class ThermalPrinter:
         self.md_printer = KITCHEN_MD_PRINTER
         self.art_printer = KITCHEN_ART_PRINTER
     
-    def print_image(self, image: Image.Image, cut: bool = True) -> Tuple[bool, str]:
-        """Print a PIL Image via Kitchen_Art CUPS queue."""
+    def print_image(self, image: Image.Image, cut: bool = True, dither: bool = True) -> Tuple[bool, str]:
+        """
+        Print a PIL Image via Kitchen_Art CUPS queue.
+        
+        Non-1-bit images are Floyd-Steinberg dithered; pass dither=False to
+        threshold at 50% instead (faster, and crisper for text, QR codes and
+        other near-binary content).
+        """
         available, error = _check_cups_printer(self.art_printer)
         if not available:
             return False, error
         
         try:
-            # Ensure image is 1-bit mode for thermal printing
-            if image.mode != '1':
-                image = image.convert('1')
+            image = self._prepare_image(image, dither)
             
-            # Resize if wider than print width
-            if image.width > PRINT_WIDTH_DOTS:
-                ratio = PRINT_WIDTH_DOTS / image.width
-                new_height = int(image.height * ratio)
-                image = image.resize((PRINT_WIDTH_DOTS, new_height), Image.Resampling.LANCZOS)
-                image = image.convert('1')
+            # Pipe straight to lp (no temp file)
+            return _print_to_cups(self.art_printer, data=_encode_for_cups(image))
+        
+        except Exception as e:
+            return False, f"Print error: {str(e)}"
+    
+    def print_images(self, images: list, cut: bool = True, dither: bool = True) -> Tuple[bool, str]:
+        """
+        Print several PIL Images as one receipt via Kitchen_Art CUPS queue.
+        
+        The images are stacked top to bottom into a single 1-bit strip and
+        sent as one job, instead of paying a job (and filter chain) each.
+        """
+        if not images:
+            return False, "No images to print"
+        
+        available, error = _check_cups_printer(self.art_printer)
+        if not available:
+            return False, error
+        
+        try:
+            parts = [self._prepare_image(image, dither) for image in images]
             
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                tmp_path = tmp.name
-                image.save(tmp_path, 'PNG')
+            # Left-aligned on white, like raster lines on the paper
+            strip = Image.new('1', (PRINT_WIDTH_DOTS, sum(part.height for part in parts)), 1)
+            y = 0
+            for part in parts:
+                strip.paste(part, (0, y))
+                y += part.height
             
-            try:
-                success, error = _print_to_cups(self.art_printer, tmp_path)
-                return success, error
-            finally:
-                try:
-                    os.unlink(tmp_path)
-                except:
-                    pass
+            return _print_to_cups(self.art_printer, data=_encode_for_cups(strip))
         
         except Exception as e:
             return False, f"Print error: {str(e)}"
     
-    def print_text_commands(self, commands: list, cut: bool = True) -> Tuple[bool, str]:
+    def _prepare_image(self, image: Image.Image, dither: bool) -> Image.Image:
+        """Scale an image down to the print width and convert it to 1-bit."""
+        # Let large JPEGs decode at reduced scale (and in grayscale)
+        image = draft_for_width(image, PRINT_WIDTH_DOTS, 'L')
+        
+        # Resize in grayscale if wider than print width, so the image is
+        # dithered after scaling rather than before. A box (area) filter
+        # is plenty ahead of a 1-bit dither
+        if image.width > PRINT_WIDTH_DOTS:
+            if image.mode != 'L':
+                image = image.convert('L')
+            ratio = PRINT_WIDTH_DOTS / image.width
+            new_height = int(image.height * ratio)
+            image = image.resize(
+                (PRINT_WIDTH_DOTS, new_height),
+                _resample_filter(Image.Resampling.BOX)
+            )
+        
+        # Convert to 1-bit exactly once for thermal printing
+        if image.mode != '1':
+            image = image.convert(
+                '1',
+                dither=Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE
+            )
+        
+        return image
+    
+    def print_text_commands(self, commands: tuple, cut: bool = True) -> Tuple[bool, str]:
         """
         Print text/markdown via Kitchen_MD CUPS queue.
         Commands are converted to plain text for the CUPS queue to handle.
@@ -130,26 +405,13 @@ class ThermalPrinter:
         
         try:
             # Extract text content from commands
-            text_content = []
-            for cmd_type, data in commands:
-                if cmd_type == 'text':
-                    text_content.append(data)
-            
-            full_text = ''.join(text_content)
-            
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.txt', delete=False, mode='w', encoding='utf-8') as tmp:
-                tmp_path = tmp.name
-                tmp.write(full_text)
+            tags, payloads = commands
+            full_text = ''.join(
+                data for tag, data in zip(tags, payloads) if tag == TAG_TEXT
+            )
             
-            try:
-                success, error = _print_to_cups(self.md_printer, tmp_path)
-                return success, error
-            finally:
-                try:
-                    os.unlink(tmp_path)
-                except:
-                    pass
+            # Encode once and pipe straight to the queue (no temp file)
+            return _print_to_cups(self.md_printer, data=full_text.encode('utf-8'))
         
         except Exception as e:
             return False, f"Print error: {str(e)}"
@@ -162,6 +424,7 @@ ROLLO_PAPER_HEIGHT_INCHES = 6.0
 ROLLO_DPI = 203
 ROLLO_PRINT_WIDTH_DOTS = int(ROLLO_PAPER_WIDTH_INCHES * ROLLO_DPI)  # 812 dots
 ROLLO_PRINT_HEIGHT_DOTS = int(ROLLO_PAPER_HEIGHT_INCHES * ROLLO_DPI)  # 1218 dots
+ROLLO_CUPS_OPTIONS = ['media=Custom.4x6in', 'fit-to-page']
 
 
 class RolloPrinter:
@@ -170,6 +433,71 @@ class RolloPrinter:
     def __init__(self):
         self.printer_name = ROLLO_PRINTER_NAME
     
+    def _fit_to_sticker(self, image: Image.Image) -> Image.Image:
+        """
+        Rotate, scale and center an image onto the 4x6" sticker.
+        
+        Args:
+            image: Image in mode '1', 'L' or 'RGB'
+        
+        Returns:
+            Image to send to CUPS
+        """
+        img_width, img_height = image.size
+        
+        # Auto-rotate to maximize coverage on the 4x6" sticker: turn the
+        # image 90 degrees whenever its orientation (landscape/portrait)
+        # disagrees with the paper's. Square images are left alone
+        paper_landscape = ROLLO_PRINT_WIDTH_DOTS > ROLLO_PRINT_HEIGHT_DOTS
+        if img_width != img_height and (img_width > img_height) != paper_landscape:
+            image = image.transpose(Image.Transpose.ROTATE_90)
+            img_width, img_height = img_height, img_width
+        
+        # Scale image to fit within Rollo paper size while maintaining aspect ratio
+        
+        # Calculate scale to fit within paper bounds
+        width_scale = ROLLO_PRINT_WIDTH_DOTS / img_width
+        height_scale = ROLLO_PRINT_HEIGHT_DOTS / img_height
+        scale = min(width_scale, height_scale)
+        
+        if scale < 1.0:
+            # Image is larger than paper, scale down. Pin the limiting
+            # axis to the paper size exactly (int(w * scale) can land one
+            # dot short) so the canvas can be skipped below
+            if width_scale <= height_scale:
+                new_width = ROLLO_PRINT_WIDTH_DOTS
+                new_height = min(int(img_height * scale), ROLLO_PRINT_HEIGHT_DOTS)
+            else:
+                new_width = min(int(img_width * scale), ROLLO_PRINT_WIDTH_DOTS)
+                new_height = ROLLO_PRINT_HEIGHT_DOTS
+            # Pillow can only NEAREST-sample 1-bit images; scale in grayscale
+            if image.mode == '1':
+                image = image.convert('L')
+            # BILINEAR: the Rollo driver halftones anyway, so LANCZOS's
+            # wider kernel buys nothing visible
+            image = image.resize(
+                (new_width, new_height),
+                _resample_filter(Image.Resampling.BILINEAR)
+            )
+        
+        # If the scaled image already spans the sticker's width or height,
+        # fit-to-page centers it exactly as a padded canvas would, so send
+        # it as-is. Smaller images still get the canvas, or fit-to-page
+        # would scale them up
+        if image.width == ROLLO_PRINT_WIDTH_DOTS or image.height == ROLLO_PRINT_HEIGHT_DOTS:
+            canvas = image
+        else:
+            # Create a white canvas of the exact sticker size, in the
+            # image's own mode
+            canvas = Image.new(image.mode, (ROLLO_PRINT_WIDTH_DOTS, ROLLO_PRINT_HEIGHT_DOTS), 'white')
+            
+            # Center the image on the canvas
+            paste_x = (ROLLO_PRINT_WIDTH_DOTS - image.width) // 2
+            paste_y = (ROLLO_PRINT_HEIGHT_DOTS - image.height) // 2
+            canvas.paste(image, (paste_x, paste_y))
+        
+        return canvas
+    
     def print_image(self, image: Image.Image, cut: bool = True) -> Tuple[bool, str]:
         """
         Print a PIL Image to the Rollo printer via CUPS.
@@ -181,81 +509,62 @@ class RolloPrinter:
             return False, error
         
         try:
-            # Convert to RGB if necessary (Rollo handles color/grayscale)
-            if image.mode == '1':
-                image = image.convert('L')
-            elif image.mode == 'RGBA':
-                # Create white background for transparency
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[3])
-                image = background
-            elif image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            img_width, img_height = image.size
-            
-            # Auto-rotate to maximize coverage on 4x6" sticker (portrait orientation)
-            # Paper is 4" wide x 6" tall, so aspect ratio is 4/6 = 0.667
-            paper_aspect = ROLLO_PAPER_WIDTH_INCHES / ROLLO_PAPER_HEIGHT_INCHES  # 0.667
-            image_aspect = img_width / img_height
-            
-            # If image is landscape (wider than tall) and paper is portrait,
-            # rotate the image 90 degrees to better fill the paper
-            if image_aspect > 1.0 and paper_aspect < 1.0:
-                # Landscape image on portrait paper - rotate to fill better
-                image = image.rotate(90, expand=True)
-                img_width, img_height = image.size
-            elif image_aspect < 1.0 and paper_aspect > 1.0:
-                # Portrait image on landscape paper - rotate to fill better
-                image = image.rotate(90, expand=True)
-                img_width, img_height = image.size
-            
-            # Scale image to fit within Rollo paper size while maintaining aspect ratio
-            
-            # Calculate scale to fit within paper bounds
-            width_scale = ROLLO_PRINT_WIDTH_DOTS / img_width
-            height_scale = ROLLO_PRINT_HEIGHT_DOTS / img_height
-            scale = min(width_scale, height_scale)
-            
-            if scale < 1.0:
-                # Image is larger than paper, scale down
-                new_width = int(img_width * scale)
-                new_height = int(img_height * scale)
-                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Create a white canvas of the exact sticker size
-            canvas = Image.new('RGB', (ROLLO_PRINT_WIDTH_DOTS, ROLLO_PRINT_HEIGHT_DOTS), (255, 255, 255))
-            
-            # Center the image on the canvas
-            paste_x = (ROLLO_PRINT_WIDTH_DOTS - image.width) // 2
-            paste_y = (ROLLO_PRINT_HEIGHT_DOTS - image.height) // 2
-            canvas.paste(image, (paste_x, paste_y))
+            canvas = self._prepare_image(image)
             
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                tmp_path = tmp.name
-                canvas.save(tmp_path, 'PNG')
-            
-            try:
-                success, error = _print_to_cups(
-                    self.printer_name,
-                    tmp_path,
-                    ['media=Custom.4x6in', 'fit-to-page']
-                )
-                return success, error
-            finally:
-                # Clean up temp file
-                try:
-                    os.unlink(tmp_path)
-                except:
-                    pass
+            # Pipe straight to lp (no temp file)
+            return _print_to_cups(
+                self.printer_name,
+                options=ROLLO_CUPS_OPTIONS,
+                data=_encode_for_cups(canvas)
+            )
         
         except subprocess.TimeoutExpired:
             return False, "Timeout sending print job"
         except Exception as e:
             return False, f"Print error: {str(e)}"
     
-    def print_text_commands(self, commands: list, cut: bool = True) -> Tuple[bool, str]:
+    def print_images(self, images: list, cut: bool = True) -> Tuple[bool, str]:
+        """
+        Print several PIL Images to the Rollo printer, one sticker each.
+        
+        With pycups the stickers are submitted as a single multi-document
+        CUPS job rather than one job per image.
+        """
+        if not images:
+            return False, "No images to print"
+        
+        available, error = _check_cups_printer(self.printer_name)
+        if not available:
+            return False, error
+        
+        try:
+            documents = [_encode_for_cups(self._prepare_image(image)) for image in images]
+            return _print_batch_to_cups(self.printer_name, documents, options=ROLLO_CUPS_OPTIONS)
+        
+        except Exception as e:
+            return False, f"Print error: {str(e)}"
+    
+    def _prepare_image(self, image: Image.Image) -> Image.Image:
+        """Normalize an image's mode and fit it to the sticker."""
+        # Let large JPEGs decode at reduced scale
+        image = draft_for_width(image, ROLLO_PRINT_WIDTH_DOTS)
+        
+        # 1-bit, grayscale and RGB go to CUPS as-is (PBM/PGM/PPM); flatten
+        # transparency and convert anything else to RGB
+        if image.mode == 'RGBA':
+            # Composite over white in one pass for transparency
+            background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, image).convert('RGB')
+        elif image.mode not in ('1', 'L', 'RGB'):
+            image = image.convert('RGB')
+        
+        # Labels pre-rendered at the exact sticker size need no rotating,
+        # scaling or padding
+        if image.size == (ROLLO_PRINT_WIDTH_DOTS, ROLLO_PRINT_HEIGHT_DOTS):
+            return image
+        return self._fit_to_sticker(image)
+    
+    def print_text_commands(self, commands: tuple, cut: bool = True) -> Tuple[bool, str]:
         """
         For Rollo, we don't support ESC/POS text commands directly.
         Text should be rendered as an image first.
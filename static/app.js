@@ -45,9 +45,11 @@ const successToast = new bootstrap.Toast(document.getElementById('successToast')
 let currentMode = 'text';
 let currentImageData = null;
 let currentAiImageData = null;
+let currentAiImageToken = null;  // lets /api/print reuse the server's processed image
 let previewDebounceTimer = null;
 let currentLengthInches = 0;
 let currentPrinter = 'usb';
+let displayedPreviewEtag = null;  // ETag of the preview updatePreview() last showed
 
 // Drawing state
 let isDrawing = false;
@@ -357,6 +359,7 @@ async function updateDrawPreview() {
         
         // Show preview
         if (data.preview) {
+            displayedPreviewEtag = null;
             previewImage.src = 'data:image/png;base64,' + data.preview;
             previewImage.classList.remove('d-none');
             previewPlaceholder.classList.add('d-none');
@@ -400,6 +403,7 @@ function setupAiInput() {
     // Clear AI image
     clearAiImage.addEventListener('click', () => {
         currentAiImageData = null;
+        currentAiImageToken = null;
         aiImageInfo.classList.add('d-none');
         resetPreview();
     });
@@ -420,38 +424,46 @@ async function generateAiImage() {
     try {
         const rotation = document.querySelector('input[name="aiRotation"]:checked').value;
         
-        const response = await fetch('/api/generate', {
+        // Binary endpoint: images arrive as multipart parts, not base64 JSON
+        const response = await fetch('/api/generate_binary', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 prompt: prompt,
-                rotation: rotation
+                rotation: rotation,
+                regenerate: true
             })
         });
         
-        const data = await response.json();
-        
-        if (data.error) {
-            showError(data.error);
+        if (!response.ok) {
+            const data = await response.json();
+            showError(data.error || 'Failed to generate image');
             return;
         }
         
+        const form = await response.formData();
+        const lengthInches = parseFloat(form.get('lengthInches'));
+        
         // Store the generated image data (original, not processed)
-        currentAiImageData = 'data:image/png;base64,' + data.image;
+        currentAiImageData = await blobToDataUrl(form.get('image'));
+        currentAiImageToken = form.get('imageToken');
         aiImageInfo.classList.remove('d-none');
         
         // Show preview
-        previewImage.src = 'data:image/png;base64,' + data.preview;
+        const previewUrl = URL.createObjectURL(form.get('preview'));
+        previewImage.addEventListener('load', () => URL.revokeObjectURL(previewUrl), { once: true });
+        displayedPreviewEtag = null;
+        previewImage.src = previewUrl;
         previewImage.classList.remove('d-none');
         previewPlaceholder.classList.add('d-none');
         printBtn.disabled = false;
         
         // Update length display
-        currentLengthInches = data.lengthInches;
-        lengthBadge.textContent = data.lengthInches.toFixed(1) + '"';
+        currentLengthInches = lengthInches;
+        lengthBadge.textContent = lengthInches.toFixed(1) + '"';
         
         // Warning
-        if (data.warning) {
+        if (form.get('warning') === 'true') {
             lengthBadge.classList.remove('bg-secondary', 'bg-success');
             lengthBadge.classList.add('bg-danger');
             lengthWarning.classList.remove('d-none');
@@ -469,6 +481,16 @@ async function generateAiImage() {
     }
 }
 
+// Read a Blob into a data URL (used to keep generated images for printing)
+function blobToDataUrl(blob) {
+    return new Promise((resolve, reject) => {
+        const reader = new FileReader();
+        reader.onload = () => resolve(reader.result);
+        reader.onerror = () => reject(reader.error);
+        reader.readAsDataURL(blob);
+    });
+}
+
 // Update AI preview (when rotation changes)
 async function updateAiPreview() {
     if (!currentAiImageData) {
@@ -498,6 +520,7 @@ async function updateAiPreview() {
         
         // Show preview
         if (data.preview) {
+            displayedPreviewEtag = null;
             previewImage.src = 'data:image/png;base64,' + data.preview;
             previewImage.classList.remove('d-none');
             previewPlaceholder.classList.add('d-none');
@@ -554,9 +577,14 @@ async function updatePreview() {
     }
     
     try {
+        const headers = { 'Content-Type': 'application/json' };
+        if (displayedPreviewEtag) {
+            headers['If-None-Match'] = displayedPreviewEtag;
+        }
+        
         const response = await fetch('/api/preview', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: headers,
             body: JSON.stringify({
                 mode: currentMode,
                 content: content,
@@ -565,6 +593,11 @@ async function updatePreview() {
             })
         });
         
+        // Same input as the preview already on screen
+        if (response.status === 304) {
+            return;
+        }
+        
         const data = await response.json();
         
         if (data.error) {
@@ -575,6 +608,7 @@ async function updatePreview() {
         
         // Show preview
         if (data.preview) {
+            displayedPreviewEtag = response.headers.get('ETag');
             previewImage.src = 'data:image/png;base64,' + data.preview;
             previewImage.classList.remove('d-none');
             previewPlaceholder.classList.add('d-none');
@@ -604,6 +638,7 @@ async function updatePreview() {
 
 // Reset preview state
 function resetPreview() {
+    displayedPreviewEtag = null;
     previewImage.classList.add('d-none');
     previewPlaceholder.classList.remove('d-none');
     lengthBadge.textContent = '0.0"';
@@ -666,7 +701,8 @@ async function sendPrint() {
                 content: content,
                 fontSize: fontSize.value,
                 rotation: rotation,
-                printer: currentPrinter
+                printer: currentPrinter,
+                imageToken: currentMode === 'ai' ? currentAiImageToken : null
             })
         });
         